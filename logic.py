@@ -1,7 +1,33 @@
-from PyQt6 import QtWidgets, uic
+from PyQt6 import QtCore, QtWidgets, uic
 import csv
+import io
 import os
-from typing import Dict
+from collections import Counter
+from typing import Dict, FrozenSet, List, Set, Tuple
+
+_QUOTE_CHARS = frozenset(',"\r\n')  # Characters that force a CSV field to be quoted
+
+def tally_votes(text: str) -> Tuple[Dict[str, int], FrozenSet[str]]:
+    """
+    Count the votes per candidate in the CSV text, skipping the header row.
+    Returns the vote counts and the set of voter IDs. Rows with fewer than two fields are skipped.
+    """
+    if '"' not in text:
+        # Nothing is quoted, so plain splitting is safe and lets Counter and frozenset do the work in C
+        lines = [line for line in text.splitlines()[1:] if ',' in line]
+        counts = Counter(line.split(',', 2)[1] for line in lines)
+        return dict(counts), frozenset(line.partition(',')[0] for line in lines)
+
+    counts = Counter()
+    voter_ids = set()
+    reader = csv.reader(io.StringIO(text, newline=''))
+    next(reader, None)
+    for row in reader:
+        if len(row) >= 2:
+            voter_ids.add(row[0])
+            counts[row[1]] += 1
+    return dict(counts), frozenset(voter_ids)
+
 
 class FileManager:
     """Handles reading from and writing to the CSV file with dynamic counters."""
@@ -12,110 +38,162 @@ class FileManager:
         Ensures the file exists by calling _ensure_file_exists.
         """
         self._filename = filename
+        self._cache = None
+        self._pending: List[Tuple[str, str, int]] = []
+        self._batch_max = 16
+        self._append_fh = None
         self._ensure_file_exists()
+        self._validate_header()
+        self._frozen_ids: FrozenSet[str] = frozenset()
+        self._new_ids: Set[str] = set()
+        self._load_cache()
+        self._open_append_handle()
+
+    def _open_append_handle(self) -> bool:
+        """
+        Open a buffered append-mode handle on the CSV file that is kept live for logging votes.
+        Returns False if the file could not be opened.
+        """
+        try:
+            self._append_fh = open(self._filename, mode='a', newline='', encoding='utf-8', buffering=1 << 16)
+        except OSError as e:
+            print(f"Error opening file: {e}")
+            return False
+        return True
 
     def _ensure_file_exists(self) -> None:
         """
-        Ensure the CSV file exists. If it doesn't, create it with the required headers.
+        Ensure the CSV file exists. If it doesn't, or it is empty, create it with the required headers.
         """
-        if not os.path.exists(self._filename):
+        try:
+            needs_header = os.stat(self._filename).st_size == 0
+        except FileNotFoundError:
+            needs_header = True
+        if needs_header:
             try:
-                with open(self._filename, mode='w', newline='') as file:
+                with open(self._filename, mode='w', newline='', encoding='utf-8') as file:
                     writer = csv.DictWriter(file, fieldnames=["VoterID", "Vote", "Total"])
                     writer.writeheader()
             except IOError as e:
                 print(f"Error creating file: {e}")
 
-    def read_data(self) -> Dict[str, int]:
+    def _validate_header(self) -> None:
         """
-        Read the first row of data from the CSV file.
-        Returns a dictionary with the data or default values if the file is empty or unreadable.
+        Check once that the CSV file starts with the expected header row.
+        Raises RuntimeError if the file is malformed; otherwise the header is trusted for the session.
         """
         try:
-            with open(self._filename, mode='r', newline='') as file:
-                reader = csv.DictReader(file)
-                return next(reader)
-        except (IOError, StopIteration) as e:
-            print(f"Error reading file: {e}")
-            return {"Jane": 0, "John": 0, "Total": 0}
+            with open(self._filename, mode='r', newline='', encoding='utf-8', errors='replace') as file:
+                header = next(csv.reader(file), [])
+        except IOError as e:
+            raise RuntimeError(f"Error reading file: {e}") from e
+        if header != ["VoterID", "Vote", "Total"]:
+            raise RuntimeError(f"CSV file {self._filename} is missing the required 'VoterID,Vote,Total' header.")
+
+    def has_voter(self, voter_id: str) -> bool:
+        """
+        Return True if the given voter ID has already been used to cast a vote.
+        """
+        return voter_id in self._frozen_ids or voter_id in self._new_ids
 
-    def write_data(self, data: Dict[str, int]) -> None:
+    def _load_cache(self) -> None:
         """
-        Write the given dictionary data to the CSV file, overwriting its contents.
+        Populate the in-memory vote tally and the snapshot of voter IDs from the CSV file in a single pass.
+        Does nothing if the cache is already loaded.
         """
+        if self._cache is not None:
+            return
+        results = Counter({"Jane": 0, "John": 0})
         try:
-            with open(self._filename, mode='w', newline='') as file:
-                writer = csv.DictWriter(file, fieldnames=list(data.keys()))
-                writer.writeheader()
-                writer.writerow(data)
+            with open(self._filename, mode='r', newline='', encoding='utf-8', errors='replace') as file:
+                counts, self._frozen_ids = tally_votes(file.read())
+            results.update(counts)
         except IOError as e:
-            print(f"Error writing to file: {e}")
+            print(f"Error reading file: {e}")
+        results["Total"] = sum(results.values())
+        self._cache = results
 
     def log_vote(self, voter_id: str, name: str) -> None:
         """
         Log a vote in the CSV file. Each vote includes the voter ID, the name voted for, and the total votes.
+        The in-memory tally is updated immediately; rows are queued and written to the file in batches.
+        """
+        self._load_cache()
+        total_votes = self._cache["Total"] + 1
+        self._pending.append((voter_id, name, total_votes))
+        self._cache[name] += 1
+        self._cache["Total"] = total_votes
+        self._new_ids.add(voter_id)
+        if len(self._pending) >= self._batch_max:
+            self.flush()
+
+    def flush(self) -> None:
+        """
+        Write all queued vote rows to the CSV file with a single flush.
+        Rows stay queued if the append handle cannot be (re)opened or the write fails.
         """
+        if not self._pending:
+            return
+        if (self._append_fh is None or self._append_fh.closed) and not self._open_append_handle():
+            return
         try:
-            total_votes = 0
-            if os.path.exists(self._filename):
-                with open(self._filename, mode='r', newline='') as file:
-                    reader = csv.DictReader(file)
-                    total_votes = sum(1 for _ in reader if "VoterID" in _)
-            total_votes += 1
-            with open(self._filename, mode='a', newline='') as file:
-                writer = csv.DictWriter(file, fieldnames=["VoterID", "Vote", "Total"])
-                if file.tell() == 0:
-                    writer.writeheader()
-                writer.writerow({"VoterID": voter_id, "Vote": name, "Total": total_votes})
-        except IOError as e:
+            self._append_fh.write("".join(self._format_row(*row) for row in self._pending))
+            self._append_fh.flush()
+            self._pending.clear()
+        except (OSError, ValueError) as e:
             print(f"Error writing to file: {e}")
 
-    def read_results(self) -> Dict[str, int]:
+    @staticmethod
+    def _format_row(voter_id: str, name: str, total: int) -> str:
         """
-        Read votes from the CSV file and aggregate the results.
-        Returns a dictionary with the vote counts and the total number of votes.
+        Format one vote row. Rows are formatted directly unless the name needs CSV quoting.
         """
-        results = {"Jane": 0, "John": 0}
-        total_votes = 0
-        try:
-            with open(self._filename, mode='r', newline='') as file:
-                reader = csv.DictReader(file)
-                for row in reader:
-                    if "Jane" in row and "John" in row and "Total" in row and "VoterID" not in row:
-                        results["Jane"] = int(row.get("Jane", 0))
-                        results["John"] = int(row.get("John", 0))
-                        total_votes = int(row.get("Total", 0))
-                    elif "Vote" in row:
-                        vote = row["Vote"]
-                        results[vote] = results.get(vote, 0) + 1
-                        total_votes += 1
-            results["Total"] = total_votes
-        except IOError as e:
-            print(f"Error reading file: {e}")
-        return results
+        if _QUOTE_CHARS.isdisjoint(name):
+            return f"{voter_id},{name},{total}\r\n"
+        buffer = io.StringIO()
+        csv.writer(buffer).writerow([voter_id, name, total])
+        return buffer.getvalue()
+
+    def close(self) -> None:
+        """
+        Flush any queued vote rows and close the append handle on the CSV file.
+        """
+        self.flush()
+        if self._append_fh is not None:
+            self._append_fh.close()
 
-    def update_count(self, name: str) -> None:
+    def read_results(self) -> Dict[str, int]:
         """
-        Increment the vote count for the given name and update the total votes.
+        Return the aggregated results from the in-memory tally, loading it from the CSV file if needed.
+        Returns a dictionary with the vote counts and the total number of votes.
         """
-        data = self.read_data()
-        if name not in data:
-            data[name] = 0
-        data[name] = int(data.get(name, 0)) + 1
-        data["Total"] = int(data.get("Total", 0)) + 1
-        self.write_data(data)
+        self._load_cache()
+        return dict(self._cache)
 
-    def reset_counts(self) -> None:
+    def reset_counts(self) -> bool:
         """
         Reset the vote counts in the CSV file by deleting it and recreating it with default values.
+        Returns False if the file could not be deleted; the existing votes are then kept unchanged.
         """
+        self.close()
         try:
-            os.remove('data.csv')
-            print(f"File data.csv has been deleted successfully.")
-        except Exception as e:
+            os.remove(self._filename)
+            print(f"File {self._filename} has been deleted successfully.")
+        except FileNotFoundError:
+            pass
+        except OSError as e:
             print(f"Error deleting file: {e}")
-        
+            self._open_append_handle()
+            return False
+
+        # Rows that could not be flushed before the delete belong to the old count
+        self._pending.clear()
+        self._cache = None
         self._ensure_file_exists()
+        self._new_ids.clear()
+        self._load_cache()
+        self._open_append_handle()
+        return True
 
 
 class ProjectWindow(QtWidgets.QMainWindow):
@@ -129,6 +207,14 @@ class ProjectWindow(QtWidgets.QMainWindow):
         uic.loadUi('Project1.ui', self)
 
         self._file_manager = FileManager('data.csv')
+        QtWidgets.QApplication.instance().aboutToQuit.connect(self._file_manager.close)
+        # Flush queued votes periodically so a quiet station never holds rows in memory for long
+        self._flush_timer = QtCore.QTimer(self)
+        self._flush_timer.timeout.connect(self._file_manager.flush)
+        self._flush_timer.start(1000)
+        self._results_dialog = None
+        self._results_total_label = None
+        self._results_labels: Dict[str, QtWidgets.QLabel] = {}
 
         self.pushButton.clicked.connect(self.on_button_click)
         self.resetButton.clicked.connect(self.reset_votes)
@@ -138,6 +224,7 @@ class ProjectWindow(QtWidgets.QMainWindow):
         self.radio_button_group.addButton(self.johnRadio)
         self.radio_button_group.addButton(self.janeRadio)
         self.radio_button_group.addButton(self.otherRadio)
+        self._radio_names = {self.janeRadio: "Jane", self.johnRadio: "John", self.otherRadio: None}
 
         self.otherRadio.toggled.connect(self.toggle_textbox_visibility)
         self.lineEdit.hide()
@@ -157,52 +244,37 @@ class ProjectWindow(QtWidgets.QMainWindow):
         if not self.validate_input(voter_id):
             self.show_error_message("Voter ID is required.")
             return
-        try:
-            int(voter_id)
-        except ValueError:
-            self.show_error_message("Voter ID must be a number.")
+        if not (voter_id.isascii() and voter_id.isdigit()):
+            self.show_error_message("Voter ID must contain only the digits 0-9.")
             return
-        
-        try:
-            with open(self._file_manager._filename, mode='r', newline='') as file:
-                reader = csv.DictReader(file)
-                headers = reader.fieldnames  # Get headers from the file
-
-                # Check if the required header exists
-                if "VoterID" not in headers:
-                    self.show_error_message("CSV file is missing the required 'VoterID' column.")
-                    return
-
-                # Check if the voter ID already exists
-                if any(voter_id == row["VoterID"] for row in reader):  
-                    self.show_error_message("This Voter ID has already been used. You cannot vote again.")
-                    return
-        except IOError:
-            self.show_error_message("Error reading file.")
+
+        # Check if the voter ID already exists
+        if self._file_manager.has_voter(voter_id):
+            self.show_error_message("This Voter ID has already been used. You cannot vote again.")
+            return
+
+        selected = self.radio_button_group.checkedButton()
+        if selected is None:
+            self.show_error_message("Please select an option.")
             return
 
-        if self.janeRadio.isChecked():
-            self._file_manager.log_vote(voter_id, "Jane")
-            self.label.setText("Thank you for voting for Jane!")
-        elif self.johnRadio.isChecked():
-            self._file_manager.log_vote(voter_id, "John")
-            self.label.setText("Thank you for voting for John!")
-        elif self.otherRadio.isChecked():
+        name = self._radio_names[selected]
+        if name is not None:
+            self._file_manager.log_vote(voter_id, name)
+            self.label.setText(f"Thank you for voting for {name}!")
+        else:
             user_input = self.lineEdit.text().strip()
             if self.validate_input(user_input):
-                try:
-                    int(user_input)
+                unsigned = user_input[1:] if user_input[0] in "+-" else user_input
+                if unsigned.isdecimal():
                     self.show_error_message("Please enter a valid name, not a number.")
-                except ValueError:
+                else:
                     self._file_manager.log_vote(voter_id, user_input)
                     self.label.setText(f"Thank you for voting for {user_input}!")
                     self.lineEdit.clear()
             else:
                 self.show_error_message("Invalid input. Please enter non-empty text.")
                 return
-        else:
-            self.show_error_message("Please select an option.")
-            return
 
         self.idInput.clear()
 
@@ -220,29 +292,42 @@ class ProjectWindow(QtWidgets.QMainWindow):
         Display the aggregated voting results in a new window.
         """
         data = self._file_manager.read_results()
-        results_window = QtWidgets.QDialog(self)
-        results_window.setWindowTitle("Vote Results")
-        results_window.resize(400, 300)
+        if self._results_dialog is None:
+            self._results_dialog = QtWidgets.QDialog(self)
+            self._results_dialog.setWindowTitle("Vote Results")
+            self._results_dialog.resize(400, 300)
+
+            layout = QtWidgets.QVBoxLayout()
+            self._results_total_label = QtWidgets.QLabel()
+            self._results_total_label.setStyleSheet("font-size: 14px; font-weight: bold;")
+            layout.addWidget(self._results_total_label)
+            self._results_dialog.setLayout(layout)
 
-        layout = QtWidgets.QVBoxLayout()
         total = data.pop("Total", 0)
-        total_label = QtWidgets.QLabel(f"Total Votes: {total}")
-        total_label.setStyleSheet("font-size: 14px; font-weight: bold;")
-        layout.addWidget(total_label)
+        self._results_total_label.setText(f"Total Votes: {total}")
+
+        # Drop labels for candidates that no longer have an entry (e.g. after a reset)
+        for name in [name for name in self._results_labels if name not in data]:
+            self._results_labels.pop(name).deleteLater()
 
         for name, count in data.items():
-            label = QtWidgets.QLabel(f"{name}: {count}")
-            label.setStyleSheet("font-size: 14px;")
-            layout.addWidget(label)
+            label = self._results_labels.get(name)
+            if label is None:
+                label = QtWidgets.QLabel()
+                label.setStyleSheet("font-size: 14px;")
+                self._results_dialog.layout().addWidget(label)
+                self._results_labels[name] = label
+            label.setText(f"{name}: {count}")
 
-        results_window.setLayout(layout)
-        results_window.exec()
+        self._results_dialog.exec()
 
     def reset_votes(self) -> None:
         """
         Reset all votes to zero and update the label to indicate success.
         """
-        self._file_manager.reset_counts()
+        if not self._file_manager.reset_counts():
+            self.show_error_message("Could not reset votes. Close any program using the data file and try again.")
+            return
         self.label.setStyleSheet("color: red;")
         self.label.setText("Votes reset successfully!")
 